@@ -2,7 +2,7 @@ import time
 import random
 import statistics
 import networkx as nx
-from compiled_graph import CompiledGraph
+from compiled_graph import compile_graph
 
 def generate_benchmark_graph(n=10000, avg_degree=8):
     """Generate a realistic sparse graph."""
@@ -56,7 +56,7 @@ def benchmark():
     # CompiledGraph
     print("Running CompiledGraph...", end="", flush=True)
     t0 = time.perf_counter()
-    cg = CompiledGraph(G)
+    cg = compile_graph(G)
     compile_time_ms = (time.perf_counter() - t0) * 1000
     
     cg_times = []
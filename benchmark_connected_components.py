@@ -1,7 +1,7 @@
 import time
 import statistics
 import networkx as nx
-from compiled_graph import CompiledGraph
+from compiled_graph import compile_graph
 
 def generate_benchmark_graph(n=20000, p=0.0005):
     """Generate a large sparse graph."""
@@ -27,7 +27,7 @@ def benchmark():
 
     # CompiledGraph Reference
     print("Running CompiledGraph...", end="", flush=True)
-    cg = CompiledGraph(G) 
+    cg = compile_graph(G) 
     t0 = time.perf_counter()
     ref_comps = cg.connected_components()
     ref_time = (time.perf_counter() - t0) * 1000
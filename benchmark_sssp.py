@@ -126,8 +126,17 @@ def main():
         num_queries
     )
     
-    # 4. Report
+    # 4. Throughput: all queries as one parallel batch
+    print(f"[*] Running Optimized Arch batch ({num_queries} queries, parallel)...")
+    CG.single_source_shortest_paths_batch(sources[:1])
+    t0 = time.perf_counter()
+    CG.single_source_shortest_paths_batch(sources)
+    batch_ms = (time.perf_counter() - t0) * 1000
+    
+    # 5. Report
     print_report(nx_times, ev_times, compile_cost)
+    print(f"Batch Throughput:  {batch_ms:.2f} ms total, "
+          f"{batch_ms / num_queries:.3f} ms/query amortized")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
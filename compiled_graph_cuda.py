@@ -0,0 +1,89 @@
+"""
+CudaGraph: optional GPU backend for CompiledGraph.
+
+Keeps the CSR arrays resident in device memory and answers multi-source
+SSSP queries with a frontier-free Bellman-Ford relaxation: every thread owns
+one (source, node) pair, scans the node's out-edges and atomically lowers
+its neighbors' distances until a sweep changes nothing.
+
+Requires a CUDA-capable GPU and Numba's CUDA support.
+"""
+
+import numpy as np
+from numba import cuda
+
+
+# Threads per block along the node axis
+_THREADS_PER_BLOCK = 256
+
+
+@cuda.jit
+def _relax_step(indptr, indices, weights, dist, changed, unreached):
+    """One Bellman-Ford sweep; grid x covers nodes, grid y covers sources (dist rows)."""
+    u, row = cuda.grid(2)
+    if u >= dist.shape[1] or row >= dist.shape[0]: return
+
+    d = dist[row, u]
+    if d == unreached: return
+    for k in range(indptr[u], indptr[u + 1]):
+        v = indices[k]
+        nd = d + weights[k]
+        if nd < dist[row, v]:
+            old = cuda.atomic.min(dist, (row, v), nd)
+            if nd < old:
+                changed[0] = 1
+
+
+class CudaGraph:
+    """
+    Device-resident copy of a CompiledGraph's CSR arrays.
+
+    **Performance:**
+    - Transfer: O(V + E) once, at construction
+    - Queries: O(V * E) work worst case, but thousands of threads per sweep;
+      pays off for large batches of sources on big graphs
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+                 n_nodes: int, unreached):
+        if not cuda.is_available():
+            raise RuntimeError("CUDA is not available; cannot build a GPU graph")
+        self.n_nodes = n_nodes
+        self.unreached = unreached
+        self.dist_dtype = np.int64 if np.issubdtype(weights.dtype, np.integer) else np.float64
+
+        self.d_indptr = cuda.to_device(indptr)
+        self.d_indices = cuda.to_device(indices)
+        self.d_weights = cuda.to_device(weights)
+
+    def sssp_batch(self, sources: np.ndarray) -> np.ndarray:
+        """
+        Distances from every source index in one kernel launch per sweep.
+
+        Returns a (len(sources), n_nodes) array in the graph's distance dtype;
+        negative sources yield rows of `unreached`.
+        """
+        n = self.n_nodes
+        dist = np.full((len(sources), n), self.unreached, dtype=self.dist_dtype)
+        for row, src in enumerate(sources):
+            if src >= 0:
+                dist[row, src] = 0
+        if n == 0 or len(sources) == 0: return dist
+
+        d_dist = cuda.to_device(dist)
+        d_changed = cuda.device_array(1, dtype=np.int32)
+        blocks = ((n + _THREADS_PER_BLOCK - 1) // _THREADS_PER_BLOCK, len(sources))
+
+        # Shortest paths have at most n - 1 edges, so n sweeps always suffice
+        for _ in range(n):
+            d_changed.copy_to_device(np.zeros(1, dtype=np.int32))
+            _relax_step[blocks, (_THREADS_PER_BLOCK, 1)](
+                self.d_indptr, self.d_indices, self.d_weights, d_dist, d_changed,
+                self.unreached)
+            if d_changed.copy_to_host()[0] == 0: break
+
+        return d_dist.copy_to_host()
+
+    def sssp(self, src: int) -> np.ndarray:
+        """Distances from a single source index."""
+        return self.sssp_batch(np.array([src], dtype=np.int64))[0]
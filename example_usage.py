@@ -1,5 +1,5 @@
 import networkx as nx
-from compiled_graph import CompiledGraph
+from compiled_graph import compile_graph
 import time
 
 def main():
@@ -13,7 +13,7 @@ def main():
     # 2. Compile it
     print("\nCompiling graph structure...")
     t0 = time.time()
-    cg = CompiledGraph(G)
+    cg = compile_graph(G)
     print(f"Compilation finished in {(time.time()-t0)*1000:.2f}ms")
 
     # 3. Compare SSSP (One-to-Many)
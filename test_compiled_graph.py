@@ -5,7 +5,11 @@ Validates correctness against NetworkX ground truth.
 """
 
 import networkx as nx
+import numpy as np
+import pytest
 import random
+from numba import cuda
+import compiled_graph
 from compiled_graph import CompiledGraph
 
 
@@ -24,7 +28,7 @@ def test_single_source_shortest_paths():
     # Compare with NetworkX
     for source in ['A', 'B', 'C', 'D']:
         nx_result = nx.single_source_dijkstra_path_length(G, source)
-        compiled_result = compiled.single_source_shortest_paths(source)
+        compiled_result = compiled.single_source_shortest_paths(source).as_dict()
         
         assert nx_result == compiled_result, f"SSSP mismatch for source {source}"
         print(f"  ✓ SSSP from {source}: PASS")
@@ -40,14 +44,101 @@ def test_single_source_shortest_paths():
     
     for source in ['A', 'B', 'C', 'D']:
         nx_result = nx.single_source_dijkstra_path_length(G2, source)
-        compiled_result = compiled2.single_source_shortest_paths(source)
+        compiled_result = compiled2.single_source_shortest_paths(source).as_dict()
         
         assert nx_result == compiled_result, f"Diamond SSSP mismatch for source {source}"
         print(f"  ✓ Diamond SSSP from {source}: PASS")
     
+    # Test 3: Early exit on a single target
+    for source, target in [('A', 'D'), ('D', 'A'), ('B', 'C'), ('C', 'C')]:
+        nx_dist = nx.shortest_path_length(G2, source, target, weight='weight')
+        compiled_result = compiled2.single_source_shortest_paths(source, target=target)
+        
+        assert compiled_result[target] == nx_dist, f"Targeted SSSP mismatch for {source} -> {target}"
+        assert compiled_result[source] == 0, f"Source distance should be 0 for {source}"
+        print(f"  ✓ Targeted SSSP {source} -> {target}: PASS")
+    
     print("\n✅ All SSSP tests passed!")
 
 
+def test_node_distance_view():
+    """Test the Mapping interface of SSSP results."""
+    print("\n=== Testing NodeDistanceView ===")
+    
+    G = nx.path_graph(5)
+    G.add_node(5)  # Isolated, so unreachable from 0
+    compiled = CompiledGraph(G)
+    view = compiled.single_source_shortest_paths(0)
+    nx_result = nx.single_source_dijkstra_path_length(G, 0)
+    
+    assert view[3] == 3 and 3 in view, "Lookup of a reachable node failed"
+    assert 5 not in view and 'x' not in view, "Unreachable/unknown nodes should not be contained"
+    for missing in [5, 'x']:
+        try:
+            view[missing]
+            assert False, f"Expected KeyError for {missing!r}"
+        except KeyError:
+            pass
+    
+    assert list(view) == [0, 1, 2, 3, 4], f"Iteration mismatch: {list(view)}"
+    assert len(view) == 5, f"Length mismatch: {len(view)}"
+    assert view.get(5) is None and view.get(2) == 2, "get() mismatch"
+    assert dict(view.items()) == nx_result and view == nx_result, "Mapping contents mismatch"
+    print(f"  ✓ Mapping interface: PASS")
+    
+    print("\n✅ NodeDistanceView test passed!")
+
+
+def test_single_source_shortest_paths_batch():
+    """Test parallel batch SSSP against the per-query API."""
+    print("\n=== Testing Batch Single-Source Shortest Paths ===")
+    
+    random.seed(7)
+    G = nx.gnm_random_graph(200, 500, seed=7)
+    for u, v in G.edges():
+        G[u][v]['weight'] = random.randint(1, 10)
+    
+    compiled = CompiledGraph(G)
+    sources = [0, 13, 42, 199]
+    batch = compiled.single_source_shortest_paths_batch(sources)
+    nodes = list(G.nodes())
+    
+    assert batch.shape == (len(sources), compiled.n_nodes), f"Unexpected shape {batch.shape}"
+    for row, source in zip(batch, sources):
+        nx_result = nx.single_source_dijkstra_path_length(G, source)
+        batch_result = {nodes[i]: d for i, d in enumerate(row) if d != float('inf')}
+        
+        assert nx_result == batch_result, f"Batch SSSP mismatch for source {source}"
+    print(f"  ✓ Batch SSSP ({len(sources)} sources): PASS")
+    
+    print("\n✅ Batch SSSP test passed!")
+
+
+@pytest.mark.skipif(not cuda.is_available(), reason="needs a CUDA GPU or NUMBA_ENABLE_CUDASIM=1")
+def test_gpu_batch_sssp():
+    """Test the CUDA batch SSSP backend against the CPU batch."""
+    print("\n=== Testing GPU Batch Single-Source Shortest Paths ===")
+    
+    random.seed(9)
+    for name, weight in [('int', lambda: random.randint(1, 10)),
+                         ('float', lambda: random.uniform(0.5, 10.0))]:
+        G = nx.gnm_random_graph(60, 120, seed=9)
+        for u, v in G.edges():
+            G[u][v]['weight'] = weight()
+        
+        sources = [0, 17, 'unknown', 59]
+        cpu = CompiledGraph(G).single_source_shortest_paths_batch(sources)
+        gpu = CompiledGraph(G, use_gpu=True).single_source_shortest_paths_batch(sources)
+        
+        assert gpu.shape == cpu.shape, f"{name}: shape mismatch {gpu.shape} vs {cpu.shape}"
+        assert np.array_equal(np.isinf(gpu), np.isinf(cpu)), f"{name}: reachability mismatch"
+        assert np.allclose(gpu[np.isfinite(cpu)], cpu[np.isfinite(cpu)]), f"{name}: distance mismatch"
+        assert np.all(np.isinf(gpu[2])), f"{name}: unknown source should give an all-inf row"
+        print(f"  ✓ GPU batch ({name} weights): PASS")
+    
+    print("\n✅ GPU batch SSSP test passed!")
+
+
 def test_bidirectional_shortest_path():
     """Test bidirectional search against NetworkX."""
     print("\n=== Testing Bidirectional Shortest Path ===")
@@ -90,6 +181,29 @@ def test_bidirectional_shortest_path():
     assert result is None, "Should return None for disconnected nodes"
     print(f"  ✓ Disconnected nodes: correctly returns None")
     
+    # Test 3: Unweighted graph (bidirectional BFS path)
+    G3 = nx.erdos_renyi_graph(200, 0.02, seed=42)
+    compiled3 = CompiledGraph(G3)
+    random.seed(42)
+    
+    for _ in range(20):
+        src = random.randrange(200)
+        tgt = random.randrange(200)
+        result = compiled3.bidirectional_shortest_path(src, tgt)
+        
+        if not nx.has_path(G3, src, tgt):
+            assert result is None, f"Should return None for disconnected pair {src} -> {tgt}"
+            continue
+        
+        compiled_dist, path = result
+        assert compiled_dist == nx.shortest_path_length(G3, src, tgt), \
+            f"Unweighted distance mismatch for {src} -> {tgt}"
+        assert path[0] == src and path[-1] == tgt, f"Path endpoints wrong: {path}"
+        assert len(path) - 1 == compiled_dist, f"Path length does not match distance: {path}"
+        assert all(G3.has_edge(a, b) for a, b in zip(path, path[1:])), f"Path uses missing edge: {path}"
+    
+    print(f"  ✓ Unweighted graph (20 random pairs): PASS")
+    
     print("\n✅ All bidirectional tests passed!")
 
 
@@ -114,7 +228,27 @@ def test_bfs():
     # Check source is first
     assert bfs_result[0] == 0, "Source should be first in BFS order"
     
+    # Labels equal to an int node resolve like dict keys would
+    for label in [2.0, np.int64(2)]:
+        assert compiled.bfs(label)[0] == 2, f"Label {label!r} should resolve to node 2"
+    assert compiled.bfs(2.5) == [] and compiled.bfs('2') == [], "Non-matching labels should not resolve"
+    
     print(f"  ✓ BFS order: {bfs_result}")
+    
+    # Large graphs: from node 0 this undirected graph runs top-down, switches
+    # to bottom-up and back; the directed one stays top-down throughout
+    for directed in [False, True]:
+        G2 = nx.gnm_random_graph(2000, 8000, seed=5, directed=directed)
+        order = CompiledGraph(G2).bfs(0)
+        levels = nx.single_source_shortest_path_length(G2, 0)
+    
+        assert set(order) == set(levels), f"Reached set mismatch (directed={directed})"
+        assert len(order) == len(levels), f"Duplicate nodes in BFS order (directed={directed})"
+        order_levels = [levels[v] for v in order]
+        assert all(a <= b for a, b in zip(order_levels, order_levels[1:])), \
+            f"BFS levels decrease (directed={directed})"
+        print(f"  ✓ Large {'directed' if directed else 'undirected'} BFS level order: PASS")
+    
     print("\n✅ BFS test passed!")
 
 
@@ -215,7 +349,7 @@ def test_large_graph():
     # Test SSSP
     source = 0
     nx_result = nx.single_source_dijkstra_path_length(G, source)
-    compiled_result = compiled.single_source_shortest_paths(source)
+    compiled_result = compiled.single_source_shortest_paths(source).as_dict()
     
     assert nx_result == compiled_result, "SSSP mismatch on large graph"
     print(f"  ✓ SSSP: PASS")
@@ -251,6 +385,162 @@ def test_large_graph():
     print("\n✅ Large graph tests passed!")
 
 
+def test_csr_build_without_scipy():
+    """The pure-Python CSR fallback must match the SciPy build exactly."""
+    print("\n=== Testing CSR Build Without SciPy ===")
+    
+    random.seed(3)
+    G = nx.relabel_nodes(nx.gnm_random_graph(80, 200, seed=3), lambda i: f"n{i}")
+    G.add_edge('n5', 'n5')  # Self-loop
+    for u, v in G.edges():
+        G[u][v]['weight'] = random.randint(1, 20)
+    
+    scipy_build = CompiledGraph(G)
+    compiled_graph._HAS_SCIPY = False
+    try:
+        fallback_build = CompiledGraph(G)
+    finally:
+        compiled_graph._HAS_SCIPY = True
+    
+    for name in ['indptr', 'indices', 'weights']:
+        a, b = getattr(scipy_build, name), getattr(fallback_build, name)
+        assert a.dtype == b.dtype and np.array_equal(a, b), f"CSR {name} differs without SciPy"
+    print(f"  ✓ CSR arrays identical: PASS")
+    
+    for source in ['n0', 'n5', 'n42']:
+        nx_result = nx.single_source_dijkstra_path_length(G, source)
+        assert fallback_build.single_source_shortest_paths(source).as_dict() == nx_result, \
+            f"Fallback SSSP mismatch for source {source}"
+        assert scipy_build.single_source_shortest_paths(source).as_dict() == nx_result, \
+            f"SciPy SSSP mismatch for source {source}"
+    print(f"  ✓ SSSP on both builds: PASS")
+    
+    # Parallel edges must keep their own weights, not be summed into one slot
+    M = nx.MultiGraph()
+    M.add_edge('a', 'b', weight=5)
+    M.add_edge('a', 'b', weight=1)
+    M.add_edge('b', 'c', weight=2)
+    U = nx.MultiGraph([(0, 1), (0, 1), (1, 2)])
+    for multi in [M, U]:
+        scipy_build = CompiledGraph(multi)
+        compiled_graph._HAS_SCIPY = False
+        try:
+            fallback_build = CompiledGraph(multi)
+        finally:
+            compiled_graph._HAS_SCIPY = True
+        for name in ['indptr', 'indices', 'weights']:
+            a, b = getattr(scipy_build, name), getattr(fallback_build, name)
+            assert a.dtype == b.dtype and np.array_equal(a, b), \
+                f"Multigraph CSR {name} differs without SciPy"
+        source, target = list(multi.nodes())[0], list(multi.nodes())[-1]
+        nx_result = nx.single_source_dijkstra_path_length(multi, source)
+        for build in [scipy_build, fallback_build]:
+            assert build.single_source_shortest_paths(source).as_dict() == nx_result, \
+                "Multigraph SSSP mismatch"
+            assert build.bidirectional_shortest_path(source, target)[0] == nx_result[target], \
+                "Multigraph bidirectional distance mismatch"
+    print(f"  ✓ MultiGraph parallel edges: PASS")
+    
+    print("\n✅ No-SciPy build test passed!")
+
+
+def test_heap_path_weights():
+    """Weights that rule out Dial's bucket queue go through the binary-heap kernels."""
+    print("\n=== Testing Heap-Path Edge Weights ===")
+    
+    random.seed(11)
+    # name -> (weight generator, expected distance type)
+    weight_cases = {
+        'non-integral float': (lambda: random.uniform(0.5, 10.0), float),
+        'zero-weight edge': (lambda: random.choice([0, 1, 2, 3]), int),
+        'weight above bucket limit': (lambda: random.randint(1, 1000), int),
+    }
+    
+    for name, (weight, dist_type) in weight_cases.items():
+        G = nx.gnm_random_graph(150, 300, seed=11)
+        for u, v in G.edges():
+            G[u][v]['weight'] = weight()
+        
+        compiled = CompiledGraph(G)
+        assert not compiled._use_buckets, f"{name}: should not use the bucket queue"
+        assert compiled._int_weights == (dist_type is int), f"{name}: wrong kernel specialization"
+        
+        sources = [0, 37, 74, 149]
+        batch = compiled.single_source_shortest_paths_batch(sources)
+        
+        for row, source in zip(batch, sources):
+            nx_result = nx.single_source_dijkstra_path_length(G, source)
+            compiled_result = compiled.single_source_shortest_paths(source).as_dict()
+            
+            assert compiled_result == nx_result, f"{name}: SSSP mismatch for source {source}"
+            assert all(type(d) is dist_type for d in compiled_result.values()), \
+                f"{name}: SSSP distances should be {dist_type.__name__}"
+            assert {i: d for i, d in enumerate(row) if d != float('inf')} == nx_result, \
+                f"{name}: batch SSSP mismatch for source {source}"
+            
+            for target in [5, 60, 120]:
+                targeted = compiled.single_source_shortest_paths(source, target=target)
+                result = compiled.bidirectional_shortest_path(source, target)
+                
+                if target not in nx_result:
+                    assert target not in targeted, f"{name}: {target} should be unreachable"
+                    assert result is None, f"{name}: should return None for {source} -> {target}"
+                    continue
+                
+                nx_dist = nx.shortest_path_length(G, source, target, weight='weight')
+                assert abs(targeted[target] - nx_dist) < 1e-9, \
+                    f"{name}: targeted SSSP mismatch for {source} -> {target}"
+                assert result is not None and abs(result[0] - nx_dist) < 1e-9, \
+                    f"{name}: bidirectional mismatch for {source} -> {target}"
+                assert type(targeted[target]) is dist_type and type(result[0]) is dist_type, \
+                    f"{name}: distances should be {dist_type.__name__}"
+        
+        print(f"  ✓ {name}: PASS")
+    
+    print("\n✅ Heap-path weight tests passed!")
+
+
+def test_non_finite_weights():
+    """Graphs with inf/NaN edge weights still compile and answer queries."""
+    print("\n=== Testing Non-Finite Edge Weights ===")
+    
+    for bad_weight in [float('inf'), float('nan')]:
+        G = nx.Graph()
+        G.add_edge('a', 'b', weight=bad_weight)
+        G.add_edge('b', 'c', weight=1.5)
+        
+        compiled = CompiledGraph(G)
+        
+        # NetworkX also reports the non-finite distance; compare the finite part
+        nx_result = {n: d for n, d in nx.single_source_dijkstra_path_length(G, 'b').items()
+                     if d < float('inf')}
+        assert compiled.single_source_shortest_paths('b').as_dict() == nx_result, \
+            f"SSSP mismatch with weight {bad_weight}"
+        assert set(compiled.bfs('b')) == {'a', 'b', 'c'}, "BFS should reach every node"
+        assert compiled.connected_components() == [{'a', 'b', 'c'}], "Component mismatch"
+        assert compiled.bidirectional_shortest_path('b', 'c') == (1.5, ['b', 'c']), \
+            "Bidirectional mismatch"
+        print(f"  ✓ Edge weight {bad_weight}: PASS")
+    
+    print("\n✅ Non-finite weight tests passed!")
+
+
+def test_negative_weights():
+    """Negative edge weights are rejected at compile time, like NetworkX's Dijkstra."""
+    print("\n=== Testing Negative Edge Weights ===")
+    
+    for weight in [-1, -0.5]:
+        G = nx.Graph()
+        G.add_edge(0, 1, weight=weight)
+        G.add_edge(1, 2, weight=3)
+        with pytest.raises(ValueError):
+            nx.single_source_dijkstra_path_length(G, 0)
+        with pytest.raises(ValueError):
+            CompiledGraph(G)
+        print(f"  ✓ Edge weight {weight} rejected: PASS")
+    
+    print("\n✅ Negative weight tests passed!")
+
 def run_all_tests():
     """Run complete test suite."""
     print("="*60)
@@ -258,11 +548,19 @@ def run_all_tests():
     print("="*60)
     
     test_single_source_shortest_paths()
+    test_node_distance_view()
+    test_single_source_shortest_paths_batch()
+    if cuda.is_available():
+        test_gpu_batch_sssp()
     test_bidirectional_shortest_path()
     test_bfs()
     test_dfs()
     test_connected_components()
     test_large_graph()
+    test_csr_build_without_scipy()
+    test_heap_path_weights()
+    test_non_finite_weights()
+    test_negative_weights()
     
     print("\n" + "="*60)
     print("🎉 ALL TESTS PASSED!")